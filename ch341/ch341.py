@@ -1,11 +1,13 @@
 from ctypes import *
-import platform
+from contextlib import contextmanager
+import struct
+import sys
+import threading
+import time
 import warnings
-from typing import Optional, Union, Callable
+from typing import Optional, Union, Callable, Iterable
 
-pyver = [int(i) for i in platform.python_version_tuple()]
-
-if not (pyver[0] >= 3 and pyver[1] >= 9):
+if sys.version_info < (3, 9):
     warnings.warn("This Library requires python3.9+")
 
 
@@ -13,11 +15,11 @@ class CH341Error(Exception):
     pass
 
 
-if platform.system() == "Windows":
+if sys.platform == "win32":
     try:
-        if platform.architecture()[0] == "64bit":
+        if struct.calcsize("P") == 8:
             ch341dll = windll.CH341DLLA64
-        elif platform.architecture()[0] == "32bit":
+        elif struct.calcsize("P") == 4:
             ch341dll = windll.CH341DLL
         else:
             raise RuntimeError("Unknown architecture")
@@ -30,15 +32,74 @@ if platform.system() == "Windows":
         )
 
 else:
-    raise RuntimeError("Platform '%s' is not supported." % platform.system())
+    raise RuntimeError("Platform '%s' is not supported." % sys.platform)
+
+# Declare the prototypes once so that ctypes doesn't have to guess the
+# argument and return types on every call.
+# Note that ctypes releases the GIL for the duration of every call into
+# the DLL, so other threads keep running while a USB transfer is pending.
+_prototypes = {
+    # name: (restype, argtypes)
+    "CH341GetVersion": (c_ulong, []),
+    "CH341GetDrvVersion": (c_ulong, []),
+    "CH341OpenDevice": (c_ssize_t, [c_ulong]),
+    "CH341CloseDevice": (None, [c_ulong]),
+    "CH341ResetDevice": (c_bool, [c_ulong]),
+    "CH341SetStream": (c_bool, [c_ulong, c_ulong]),
+    "CH341SetExclusive": (c_bool, [c_ulong, c_ulong]),
+    "CH341GetVerIC": (c_ulong, [c_ulong]),
+    "CH341GetDeviceName": (c_char_p, [c_ulong]),
+    "CH341WriteRead": (
+        c_bool,
+        [c_ulong, c_ulong, c_void_p, c_ulong, c_ulong, POINTER(c_ulong), c_void_p],
+    ),
+    "CH341StreamI2C": (c_bool, [c_ulong, c_ulong, c_void_p, c_ulong, c_void_p]),
+    "CH341ReadEEPROM": (c_bool, [c_ulong, c_ulong, c_ulong, c_ulong, c_void_p]),
+    "CH341WriteEEPROM": (c_bool, [c_ulong, c_ulong, c_ulong, c_ulong, c_void_p]),
+    "CH341StreamSPI4": (c_bool, [c_ulong, c_ulong, c_ulong, c_void_p]),
+    "CH341StreamSPI5": (c_bool, [c_ulong, c_ulong, c_ulong, c_void_p, c_void_p]),
+    "CH341Set_D5_D0": (c_bool, [c_ulong, c_ulong, c_ulong]),
+    "CH341GetInput": (c_bool, [c_ulong, POINTER(c_ulong)]),
+    "CH341GetStatus": (c_bool, [c_ulong, POINTER(c_ulong)]),
+    "CH341SetIntRoutine": (c_bool, [c_ulong, c_void_p]),
+}
+for _name, (_restype, _argtypes) in _prototypes.items():
+    _func = getattr(ch341dll, _name)
+    _func.restype = _restype
+    _func.argtypes = _argtypes
+del _name, _restype, _argtypes, _func
+
+# Bind the entry points once to skip the attribute lookup on every call
+_CH341GetVersion = ch341dll.CH341GetVersion
+_CH341GetDrvVersion = ch341dll.CH341GetDrvVersion
+_CH341OpenDevice = ch341dll.CH341OpenDevice
+_CH341CloseDevice = ch341dll.CH341CloseDevice
+_CH341ResetDevice = ch341dll.CH341ResetDevice
+_CH341SetStream = ch341dll.CH341SetStream
+_CH341SetExclusive = ch341dll.CH341SetExclusive
+_CH341GetVerIC = ch341dll.CH341GetVerIC
+_CH341GetDeviceName = ch341dll.CH341GetDeviceName
+_CH341WriteRead = ch341dll.CH341WriteRead
+_CH341StreamI2C = ch341dll.CH341StreamI2C
+_CH341ReadEEPROM = ch341dll.CH341ReadEEPROM
+_CH341WriteEEPROM = ch341dll.CH341WriteEEPROM
+_CH341StreamSPI4 = ch341dll.CH341StreamSPI4
+_CH341StreamSPI5 = ch341dll.CH341StreamSPI5
+_CH341Set_D5_D0 = ch341dll.CH341Set_D5_D0
+_CH341GetInput = ch341dll.CH341GetInput
+_CH341GetStatus = ch341dll.CH341GetStatus
+_CH341SetIntRoutine = ch341dll.CH341SetIntRoutine
+
+# mPCH341_INT_ROUTINE, the callback type taken by CH341SetIntRoutine
+_INT_CB_TYPE = WINFUNCTYPE(None, c_ulong)
 
 
 def get_dll_version():
-    return ch341dll.CH341GetVersion()
+    return _CH341GetVersion()
 
 
 def get_drv_version():
-    result = ch341dll.CH341GetDrvVersion()
+    result = _CH341GetDrvVersion()
     if not result:
         raise CH341Error("Operation Failed.")
     return result
@@ -59,6 +120,42 @@ mCH341A_CMD_I2C_STM_MS = 0x50
 mCH341A_CMD_I2C_STM_DLY = 0x0F
 mCH341A_CMD_I2C_STM_END = 0x00
 
+# STA, OUT, addr, STO per probe, plus the STREAM and END bytes of the packet
+_I2C_PROBES_PER_PACKET = (mCH341_PACKET_LENGTH - 2) // 4
+
+
+def _i2c_probe_packet(addrs) -> bytes:
+    """
+    Build an i2c stream packet probing every address in 'addrs'.
+    Every address gets its own START, address byte and STOP, and the
+    chip returns one ACK status byte per address.
+    """
+    packet = bytearray([mCH341A_CMD_I2C_STREAM])
+    for addr in addrs:
+        packet.extend(
+            [
+                mCH341A_CMD_I2C_STM_STA,
+                mCH341A_CMD_I2C_STM_OUT,
+                addr << 1,
+                mCH341A_CMD_I2C_STM_STO,
+            ]
+        )
+    packet.append(mCH341A_CMD_I2C_STM_END)
+    return bytes(packet)
+
+
+# The scan always sweeps the same addresses, so its packets are built once
+_I2C_SCAN_PACKETS = tuple(
+    (addrs, _i2c_probe_packet(addrs))
+    for addrs in (
+        range(first, min(first + _I2C_PROBES_PER_PACKET, 127))
+        for first in range(0, 127, _I2C_PROBES_PER_PACKET)
+    )
+)
+
+# Bit of INT# in the status word returned by CH341GetStatus
+_STATUS_INT = 1 << 10
+
 SPI_NOCS = 0x00
 SPI_CS0 = 0x80
 SPI_CS1 = 0x81
@@ -69,28 +166,136 @@ IO_READ = 0
 IO_WRITE = 1
 
 
+def _buf_ptr(buf, length: int, offset: int = 0):
+    """
+    Get a pointer to 'length' bytes of a writable buffer, starting at
+    'offset'. Unlike (c_uint8 * length).from_buffer(), this doesn't
+    create a new ctypes array type for every length.
+
+    The view is deliberately not cached between calls: bytearray doesn't
+    support weak references, so a cache keyed by id() can't notice the
+    buffer being freed, and a view kept alive would stop the caller from
+    resizing their buffer.
+    """
+    if len(buf) < offset + length:
+        raise ValueError(
+            "Buffer size too small (%d instead of at least %d bytes)"
+            % (len(buf), offset + length)
+        )
+    if not length:
+        return None
+    return byref(c_char.from_buffer(buf), offset)
+
+
+def _src_ptr(buf, length: int):
+    """
+    Same as _buf_ptr(), but for data the DLL only reads, so anything
+    bytes() accepts will do. bytes objects, and read-only views covering
+    a whole one, are passed as they are. Other read-only buffers and
+    sequences of ints are converted with bytes() once.
+    """
+    if isinstance(buf, bytes):
+        return buf
+    try:
+        view = memoryview(buf)
+    except TypeError:  # e.g. a list of ints
+        return bytes(buf)
+    if not view.readonly:
+        return _buf_ptr(buf, length)
+    src = view.obj
+    if isinstance(src, bytes) and view.c_contiguous and view.nbytes == len(src):
+        return src
+    return bytes(view)
+
+
+def _stage(stage: Array, offset: int, buf) -> Array:
+    """
+    Copy 'buf' into the reusable ctypes buffer 'stage' at 'offset'.
+    If 'stage' is too small, a new one is allocated instead, rounded up to
+    the next power of two so that a series of slightly longer transfers
+    doesn't reallocate every time. Returns the buffer holding the data.
+    """
+    length = len(buf)
+    if len(stage) < offset + length:
+        stage = (c_uint8 * (1 << (offset + length - 1).bit_length()))()
+    if length:
+        memmove(byref(stage, offset), _src_ptr(buf, length), length)
+    return stage
+
+
 class Ch341:
+    __slots__ = (
+        "index",
+        "handle",
+        "_name",
+        "_eeprom_type",
+        "_i2c_speed",
+        "_spi_bit_order",
+        "_config_deferred",
+        "_config_dirty",
+        "_io_rw",
+        "_io_out",
+        "_io_deferred",
+        "_io_dirty",
+        "_callback",
+        "_int_level",
+        "_lock",
+        "_cmd_buf",
+        "_len",
+        "_i2c_tx",
+        "_spi_tx1",
+        "_spi_tx2",
+        "__weakref__",
+    )
+
     def __init__(self, index: int = 0):
         self.index = index
+        self._name = None
         self._eeprom_type = None
         self._i2c_speed = 0
         self._spi_bit_order = SPI_LSBFIRST
+        self._config_deferred = False
+        self._config_dirty = False
         self._io_rw = 0x00
         self._io_out = 0x00
+        self._io_deferred = False
+        self._io_dirty = False
         self._callback = c_void_p(0)
+        self._int_level = None  # INT# level seen by interrupt_poll()
+
+        # Held from filling a shared buffer below until the DLL is done
+        # with it, as other threads run while the DLL call is pending
+        self._lock = threading.Lock()
+        # Reply buffer for i2c_scan and i2c_read_many
+        self._cmd_buf = (c_uint8 * mCH341_PACKET_LENGTH)()
+        self._len = c_ulong(0)
+        # Staging buffer for i2c_write, grown on demand
+        self._i2c_tx = (c_uint8 * 64)()
+        # Scratch buffers for spi_write, grown on demand
+        self._spi_tx1 = (c_uint8 * 0)()
+        self._spi_tx2 = (c_uint8 * 0)()
 
     def open(self, exclusive: bool = False):
-        self.handle = ch341dll.CH341OpenDevice(self.index)
+        self.handle = _CH341OpenDevice(self.index)
+        self._name = None  # may be a different device than last time
+        self._int_level = None
         if self.handle < 0:
             raise CH341Error("Failed to open device %d." % self.index)
         self.reset()
         self.set_exclusive(exclusive)
 
-    def close(self):
+    def close(self, reset: bool = True):
+        """
+        Release the device.
+        Pass reset=False to skip resetting the device before closing it,
+        e.g. when it's going to be reopened right away, as open() resets
+        it anyway.
+        """
         self.interrupt_clear()
         self.update_io_state(0x00, 0x00)  # set all IOs to read mode
-        self.reset()
-        ch341dll.CH341CloseDevice(self.index)
+        if reset:
+            self.reset()
+        _CH341CloseDevice(self.index)
 
     def __enter__(self):
         self.open()
@@ -100,92 +305,132 @@ class Ch341:
         self.close()
 
     def reset(self):
-        result = ch341dll.CH341ResetDevice(self.index)
+        result = _CH341ResetDevice(self.index)
         if not result:
             raise CH341Error("Operation Failed.")
 
     def _update_config(self):
-        result = ch341dll.CH341SetStream(
-            self.index, self._i2c_speed | self._spi_bit_order
-        )
+        if self._config_deferred:
+            self._config_dirty = True
+            return
+        result = _CH341SetStream(self.index, self._i2c_speed | self._spi_bit_order)
         if not result:
             raise CH341Error("Operation Failed.")
 
+    @contextmanager
+    def batch_config(self):
+        """
+        Defer the config updates of set_i2c_speed() and set_spi_bit_order()
+        until the with-block exits, so they are sent to the device at once.
+        If the block raises, its updates are dropped instead.
+
+        Deferring applies to the whole instance, so updates made by other
+        threads while the block is open are deferred too. Batch from a
+        single thread.
+        """
+        if self._config_deferred:  # nested, the outer block will flush
+            yield self
+            return
+        self._config_deferred = True
+        i2c_speed, spi_bit_order = self._i2c_speed, self._spi_bit_order
+        try:
+            yield self
+        except BaseException:
+            # Nothing was sent yet, so roll back to match the device
+            self._i2c_speed, self._spi_bit_order = i2c_speed, spi_bit_order
+            self._config_dirty = False
+            raise
+        finally:
+            self._config_deferred = False
+        if self._config_dirty:
+            self._config_dirty = False
+            self._update_config()
+
     def get_ic_version(self):
-        result = ch341dll.CH341GetVerIC(self.index)
+        result = _CH341GetVerIC(self.index)
         if not result:
             raise CH341Error("Operation Failed.")
         return result
 
     def get_name(self):
-        result = ch341dll.CH341GetDeviceName(self.index)
-        if not result:
-            raise CH341Error("Operation Failed.")
-        return string_at(result).decode()
+        if self._name is None:
+            result = _CH341GetDeviceName(self.index)
+            if not result:
+                raise CH341Error("Operation Failed.")
+            self._name = result.decode()
+        return self._name
 
     def set_exclusive(self, exclusive: bool):
-        result = ch341dll.CH341SetExclusive(self.index, exclusive)
+        result = _CH341SetExclusive(self.index, exclusive)
         if not result:
             raise CH341Error("Operation Failed.")
 
     def i2c_scan(self):
         out = []
-        for addr in range(127):
-            self._i2c_start_stop(1)
-            if self._i2c_out_byte_check_ack(addr << 1):
-                out.append(addr)
-            self._i2c_start_stop(0)
+        for addrs, packet in _I2C_SCAN_PACKETS:
+            for addr, ack in zip(addrs, self._i2c_probe(packet, len(addrs))):
+                if ack:
+                    out.append(addr)
         return out
 
+    def i2c_probe(self, dev_addr: int) -> bool:
+        """
+        Check whether a device acknowledges 'dev_addr'.
+        START, address and STOP are sent in a single USB transaction.
+        """
+        return self._i2c_probe(_i2c_probe_packet((dev_addr,)), 1)[0]
+
+    def _i2c_probe(self, packet: bytes, count: int) -> list[bool]:
+        """
+        Send a packet built by _i2c_probe_packet() and return the ACK
+        state of each of the 'count' probed addresses.
+        """
+        with self._lock:
+            buf = self._cmd_buf
+            length = self._len
+            length.value = 0
+
+            result = _CH341WriteRead(
+                self.index,
+                len(packet),
+                packet,
+                mCH341_PACKET_LENGTH,
+                1,
+                byref(length),
+                byref(buf),
+            )
+
+            if not (result and length.value == count):
+                raise CH341Error("Operation Failed.")
+
+            return [not (ack & 0x80) for ack in buf[:count]]
+
     def i2c_scan_print(self):
         device_list = self.i2c_scan()
+        devices = set(device_list)
+        lines = []
         for y in range(8):
-            for x in range(16):
-                addr = (y << 4) + x
-                if addr in device_list:
-                    print("0x{0:02X}".format(addr), end=" ")
-                else:
-                    print("[  ]", end=" ")
-            print("")
-        print(
+            lines.append(
+                " ".join(
+                    "0x{0:02X}".format(addr) if addr in devices else "[  ]"
+                    for addr in range(y << 4, (y + 1) << 4)
+                )
+            )
+        lines.append(
             f"{len(device_list)} address{' was' if len(device_list)==1 else 'es were'} detected."
         )
-
-    def _i2c_out_byte_check_ack(self, byte):
-        buf = (c_uint8 * 10)()
-        buf[0] = mCH341A_CMD_I2C_STREAM
-        buf[1] = mCH341A_CMD_I2C_STM_OUT
-        buf[2] = byte
-        buf[3] = mCH341A_CMD_I2C_STM_END
-        length = c_ulong(0)
-
-        result = ch341dll.CH341WriteRead(
-            self.index, 4, byref(buf), 32, 1, byref(length), byref(buf)
-        )
-
-        if not (result and length):
-            raise CH341Error("Operation Failed.")
-
-        if buf[length.value - 1] & 0x80:
-            return False
-        return True
-
-    def _i2c_start_stop(self, start=1):
-        cmd = (c_uint8 * 3)()
-        cmd[0] = mCH341A_CMD_I2C_STREAM
-        cmd[1] = mCH341A_CMD_I2C_STM_STA if start else mCH341A_CMD_I2C_STM_STO
-        cmd[2] = mCH341A_CMD_I2C_STM_END
-        length = c_ulong(3)
-        result = ch341dll.CH341WriteData(self.index, byref(cmd), byref(length))
-        if not result:
-            raise CH341Error("Operation Failed.")
+        print("\n".join(lines))
 
     def set_i2c_speed(self, speed: int):
         # speed = 0: 20  kHz
         # speed = 1: 100 kHz
         # speed = 2: 400 kHz
         # speed = 3: 800 kHz
-        self._i2c_speed = max(0, min(3, speed))
+        if speed < 0:
+            speed = 0
+        elif speed > 3:
+            speed = 3
+        self._i2c_speed = speed
         self._update_config()
 
     def i2c_read(
@@ -201,26 +446,144 @@ class Ch341:
             length = len(buf)
         if buf is None:
             buf = bytearray(length)
-        read_buf = (c_uint8 * length).from_buffer(buf)
 
-        write_buf = (c_uint8 * 2)((dev_addr << 1), addr)
-        result = ch341dll.CH341StreamI2C(
-            self.index, 2, byref(write_buf), length, byref(read_buf)
+        # A fresh header per call, so no other thread can overwrite it
+        # while the DLL is still reading it
+        result = _CH341StreamI2C(
+            self.index,
+            2,
+            bytes((dev_addr << 1, addr)),
+            length,
+            _buf_ptr(buf, length),
         )
         if not result:
             raise CH341Error("Operation Failed.")
         return buf
 
     def i2c_write(self, dev_addr: int, addr: int, buf: bytearray):
-        _buf = bytearray([dev_addr << 1, addr])
-        _buf.extend(buf)
-        write_buf = (c_uint8 * (len(buf) + 2)).from_buffer(_buf)
+        with self._lock:
+            write_buf = self._stage_i2c_tx(2, buf)
+            write_buf[0] = dev_addr << 1
+            write_buf[1] = addr
 
-        result = ch341dll.CH341StreamI2C(
-            self.index, len(buf) + 2, byref(write_buf), 0, 0
-        )
+            result = _CH341StreamI2C(self.index, len(buf) + 2, byref(write_buf), 0, 0)
+        if not result:
+            raise CH341Error("Operation Failed.")
+
+    def i2c_write_read(
+        self,
+        dev_addr: int,
+        write: bytearray,
+        buf: Optional[bytearray] = None,
+        length: Optional[int] = None,
+    ) -> bytearray:
+        """
+        Write 'write' to the device, then read back into 'buf' after a
+        repeated START, all within a single CH341StreamI2C call.
+        Useful for devices with multi-byte register addresses.
+        """
+        if buf is None and length is None:
+            raise ValueError("'buf' and 'length' shouldn't be both None.")
+        if length is None:
+            length = len(buf)
+        if buf is None:
+            buf = bytearray(length)
+
+        with self._lock:
+            write_buf = self._stage_i2c_tx(1, write)
+            write_buf[0] = dev_addr << 1
+
+            result = _CH341StreamI2C(
+                self.index,
+                len(write) + 1,
+                byref(write_buf),
+                length,
+                _buf_ptr(buf, length),
+            )
         if not result:
             raise CH341Error("Operation Failed.")
+        return buf
+
+    def i2c_read_many(
+        self,
+        dev_addr: int,
+        regs: Iterable[tuple[int, int]],
+        bufs: Optional[Iterable[bytearray]] = None,
+    ) -> list[bytearray]:
+        """
+        Read several registers of a device within a single USB transaction.
+        'regs' is an iterable of (addr, length) tuples, and one bytearray is
+        returned for each of them. Pass 'bufs', one buffer per register, to
+        have the data copied straight into them instead.
+        The whole request must fit into one i2c stream packet, which allows
+        about 3 registers and 32 bytes of data in total.
+        """
+        regs = list(regs)
+        if not regs:
+            raise ValueError("'regs' shouldn't be empty.")
+        if bufs is None:
+            bufs = [bytearray(n) for _, n in regs]
+        else:
+            bufs = list(bufs)
+            if len(bufs) != len(regs):
+                raise ValueError("'bufs' must hold one buffer per register.")
+        packet = bytearray([mCH341A_CMD_I2C_STREAM])
+        total = 0
+        for addr, n in regs:
+            if n < 1:
+                raise ValueError("Register length must be at least 1.")
+            packet.extend(
+                [
+                    mCH341A_CMD_I2C_STM_STA,
+                    mCH341A_CMD_I2C_STM_OUT | 2,
+                    dev_addr << 1,
+                    addr,
+                    mCH341A_CMD_I2C_STM_STA,
+                    mCH341A_CMD_I2C_STM_OUT | 1,
+                    (dev_addr << 1) | 1,
+                ]
+            )
+            if n > 1:
+                # ACK every byte except the last one
+                packet.append(mCH341A_CMD_I2C_STM_IN | (n - 1))
+            packet.append(mCH341A_CMD_I2C_STM_IN)
+            total += n
+        packet.append(mCH341A_CMD_I2C_STM_STO)
+        packet.append(mCH341A_CMD_I2C_STM_END)
+        if len(packet) > mCH341_PACKET_LENGTH or total > mCH341_PACKET_LENGTH:
+            raise ValueError("Too many registers to read in one transaction.")
+        ptrs = [_buf_ptr(out, n) for out, (_, n) in zip(bufs, regs)]
+
+        with self._lock:
+            buf = self._cmd_buf
+            length = self._len
+            length.value = 0
+            result = _CH341WriteRead(
+                self.index,
+                len(packet),
+                bytes(packet),
+                mCH341_PACKET_LENGTH,
+                1,
+                byref(length),
+                byref(buf),
+            )
+            if not (result and length.value == total):
+                raise CH341Error("Operation Failed.")
+
+            offset = 0
+            for ptr, (_, n) in zip(ptrs, regs):
+                memmove(ptr, byref(buf, offset), n)
+                offset += n
+        return bufs
+
+    def _stage_i2c_tx(self, offset: int, buf: bytearray):
+        """
+        Copy 'buf' into the i2c staging buffer, leaving 'offset' bytes in
+        front of it for the caller to fill in.
+        Must be called with self._lock held until the transfer is done.
+        """
+        self._i2c_tx = _stage(self._i2c_tx, offset, buf)
+        return self._i2c_tx
 
     def set_eeprom_type(self, eeprom_type: int):
         if not isinstance(eeprom_type, int):
@@ -245,26 +608,92 @@ class Ch341:
         if buf is None:
             buf = bytearray(length)
 
-        read_buf = (c_uint8 * length).from_buffer(buf)
-
-        result = ch341dll.CH341ReadEEPROM(
-            self.index, self._eeprom_type, addr, length, byref(read_buf)
+        result = _CH341ReadEEPROM(
+            self.index, self._eeprom_type, addr, length, _buf_ptr(buf, length)
         )
         if not result:
             raise CH341Error("Operation Failed.")
         return buf
 
-    def eeprom_write(self, addr: int, buf: bytearray):
+    def eeprom_read_large(
+        self,
+        addr: int,
+        buf: Optional[bytearray] = None,
+        length: Optional[int] = None,
+        chunk_size: int = 256,
+    ) -> bytearray:
+        """
+        Same as eeprom_read(), but read in chunks of 'chunk_size' bytes.
+        Every chunk is read straight into its place in 'buf', so no extra
+        memory is needed however large the read is.
+        """
         if self._eeprom_type is None:
             raise CH341Error("EEPROM type is not specified.")
-        write_buf = (c_uint8 * len(buf)).from_buffer(buf)
+        if buf is None and length is None:
+            raise ValueError("'buf' and 'length' shouldn't be both None.")
+        if chunk_size < 1:
+            raise ValueError("'chunk_size' must be at least 1.")
+        if length is None:
+            length = len(buf)
+        if buf is None:
+            buf = bytearray(length)
+        elif len(buf) < length:
+            # Checked up front, so that no chunk is read before failing
+            raise ValueError(
+                "Buffer size too small (%d instead of at least %d bytes)"
+                % (len(buf), length)
+            )
+
+        for offset in range(0, length, chunk_size):
+            n = min(chunk_size, length - offset)
+            result = _CH341ReadEEPROM(
+                self.index,
+                self._eeprom_type,
+                addr + offset,
+                n,
+                _buf_ptr(buf, n, offset),
+            )
+            if not result:
+                raise CH341Error("Operation Failed.")
+        return buf
 
-        result = ch341dll.CH341WriteEEPROM(
-            self.index, self._eeprom_type, addr, len(buf), byref(write_buf)
+    def eeprom_write(self, addr: int, buf: bytearray):
+        if self._eeprom_type is None:
+            raise CH341Error("EEPROM type is not specified.")
+        length = len(buf)
+        result = _CH341WriteEEPROM(
+            self.index, self._eeprom_type, addr, length, _src_ptr(buf, length)
         )
         if not result:
             raise CH341Error("Operation Failed.")
 
+    async def eeprom_read_async(
+        self,
+        addr: int,
+        buf: Optional[bytearray] = None,
+        length: Optional[int] = None,
+    ) -> bytearray:
+        """
+        Same as eeprom_read(), but the transfer runs in the event loop's
+        default executor, so other tasks keep running while it's busy.
+        Don't start another transfer on this device before it's done.
+        """
+        import asyncio  # only needed here, and already loaded by the caller
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.eeprom_read, addr, buf, length)
+
+    async def eeprom_write_async(self, addr: int, buf: bytearray):
+        """
+        Same as eeprom_write(), but the transfer runs in the event loop's
+        default executor, so other tasks keep running while it's busy.
+        Don't start another transfer on this device before it's done.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.eeprom_write, addr, buf)
+
     def spi_init(self, cs: int = SPI_NOCS):
         """
         Init the gpio to spi mode.
@@ -282,27 +711,28 @@ class Ch341:
             - IO2 CS2
             SPI may work improperly if some of these io is changed unintentionally.
         """
-        self.io_write(3, 0)  # set sck to default low
-        self.set_io_rw(3, 1)
+        with self.io_batch():
+            self.io_write(3, 0)  # set sck to default low
+            self.set_io_rw(3, 1)
 
-        self.io_write(5, 0)  # set dout0 to default low
-        self.set_io_rw(5, 1)
+            self.io_write(5, 0)  # set dout0 to default low
+            self.set_io_rw(5, 1)
 
-        self.io_write(5, 0)  # set dout1 to default low
-        self.set_io_rw(5, 1)
+            self.io_write(5, 0)  # set dout1 to default low
+            self.set_io_rw(5, 1)
 
-        # set cs to default high
-        if cs == SPI_CS0:
-            _cs = 0
-        elif cs == SPI_CS1:
-            _cs = 1
-        elif cs == SPI_CS2:
-            _cs = 2
-        else:
-            return
+            # set cs to default high
+            if cs == SPI_CS0:
+                _cs = 0
+            elif cs == SPI_CS1:
+                _cs = 1
+            elif cs == SPI_CS2:
+                _cs = 2
+            else:
+                return
 
-        self.io_write(_cs, 1)
-        self.set_io_rw(_cs, 1)
+            self.io_write(_cs, 1)
+            self.set_io_rw(_cs, 1)
 
     def set_spi_bit_order(self, bit_order: int):
         self._spi_bit_order = bit_order
@@ -315,12 +745,18 @@ class Ch341:
         /,
         cs: int = SPI_NOCS,
     ):
-        _buf1 = buf1.copy()
-        if buf2 is None:
-            _buf2 = None
-        else:
-            _buf2 = buf2.copy()
-        self.spi_swap(_buf1, _buf2, cs=cs)
+        # Swap through scratch buffers so the caller's data is left intact
+        length = len(buf1)
+        if buf2 is not None and length != len(buf2):
+            raise CH341Error("Length of buf1 and buf2 must be the same")
+        with self._lock:
+            self._spi_tx1 = _stage(self._spi_tx1, 0, buf1)
+            if buf2 is None:
+                self._spi_stream(length, byref(self._spi_tx1), None, cs)
+                return
+
+            self._spi_tx2 = _stage(self._spi_tx2, 0, buf2)
+            self._spi_stream(length, byref(self._spi_tx1), byref(self._spi_tx2), cs)
 
     def spi_read(
         self,
@@ -349,53 +785,109 @@ class Ch341:
     ):
         length = len(buf1)
         if buf2 is None:
-            write_buf = (c_uint8 * length).from_buffer(buf1)
-            result = ch341dll.CH341StreamSPI4(self.index, cs, length, byref(write_buf))
+            self._spi_stream(length, _buf_ptr(buf1, length), None, cs)
         else:
             if length != len(buf2):
                 raise CH341Error("Length of buf1 and buf2 must be the same")
-            write_buf1 = (c_uint8 * length).from_buffer(buf1)
-            write_buf2 = (c_uint8 * length).from_buffer(buf2)
-            result = ch341dll.CH341StreamSPI5(
-                self.index,
-                cs,
-                length,
-                byref(write_buf1),
-                byref(write_buf2),
-            )
+            self._spi_stream(length, _buf_ptr(buf1, length), _buf_ptr(buf2, length), cs)
+
+    def _spi_stream(self, length: int, ptr1, ptr2, cs: int):
+        if ptr2 is None:
+            result = _CH341StreamSPI4(self.index, cs, length, ptr1)
+        else:
+            result = _CH341StreamSPI5(self.index, cs, length, ptr1, ptr2)
 
         if not result:
             raise CH341Error("Operation Failed.")
 
     def _update_io_state(self):
-        result = ch341dll.CH341Set_D5_D0(
-            self.index, c_uint8(self._io_rw), c_uint8(self._io_out)
-        )
+        if self._io_deferred:
+            self._io_dirty = True
+            return
+        result = _CH341Set_D5_D0(self.index, self._io_rw, self._io_out)
         if not result:
             raise CH341Error("Operation Failed.")
 
+    @contextmanager
+    def io_batch(self):
+        """
+        Defer the IO updates made inside the with-block until it exits,
+        so they are sent to the device with a single USB transaction.
+        If the block raises, its updates are dropped instead.
+
+        Deferring applies to the whole instance, so updates made by other
+        threads while the block is open are deferred too. Batch from a
+        single thread.
+        """
+        if self._io_deferred:  # nested, the outer block will flush
+            yield self
+            return
+        self._io_deferred = True
+        io_rw, io_out = self._io_rw, self._io_out
+        try:
+            yield self
+        except BaseException:
+            # Nothing was sent yet, so roll back to match the device
+            self._io_rw, self._io_out = io_rw, io_out
+            self._io_dirty = False
+            raise
+        finally:
+            self._io_deferred = False
+        if self._io_dirty:
+            self._io_dirty = False
+            self._update_io_state()
+
     def update_io_state(self, io_rw: int, io_out: int):
         self._io_rw = io_rw
         self._io_out = io_out
         self._update_io_state()
 
     def set_io_rw(self, io: int, rw: int):
-        self._io_rw &= 0xFF ^ (1 << io)
-        self._io_rw |= bool(rw) << io
+        mask = 1 << io
+        self._io_rw = (self._io_rw & ~mask) | (mask if rw else 0)
         self._update_io_state()
 
     def io_write(self, io: int, level: int):
-        self._io_out &= 0xFF ^ (1 << io)
-        self._io_out |= bool(level) << io
+        mask = 1 << io
+        self._io_out = (self._io_out & ~mask) | (mask if level else 0)
+        self._update_io_state()
+
+    def io_write_mask(self, mask: int, levels: int):
+        """
+        Set the output level of every IO selected by 'mask' to the
+        matching bit of 'levels' with a single USB transaction.
+        """
+        self._io_out = (self._io_out & ~mask) | (levels & mask)
         self._update_io_state()
 
+    def set_ios(self, ios: Iterable[tuple[int, int, int]]):
+        """
+        Set up several IOs with a single USB transaction.
+        'ios' is an iterable of (io, rw, level) tuples.
+        """
+        io_rw = self._io_rw
+        io_out = self._io_out
+        for io, rw, level in ios:
+            mask = 1 << io
+            io_rw = (io_rw & ~mask) | (mask if rw else 0)
+            io_out = (io_out & ~mask) | (mask if level else 0)
+        self.update_io_state(io_rw, io_out)
+
     def io_read(self, io: int) -> bool:
         buf = self.io_read_all()
         return bool(buf & (1 << io))
 
+    def io_read_bits(self, ios: Iterable[int]) -> tuple[bool, ...]:
+        """
+        Read several IOs with a single USB transaction.
+        Prefer this over calling io_read() for each of them.
+        """
+        buf = self.io_read_all()
+        return tuple(bool(buf & (1 << io)) for io in ios)
+
     def io_read_all(self) -> int:
         buf = c_ulong()
-        result = ch341dll.CH341GetInput(self.index, byref(buf))
+        result = _CH341GetInput(self.index, byref(buf))
         if not result:
             raise CH341Error("Operation Failed.")
         return buf.value
@@ -405,22 +897,42 @@ class Ch341:
         Setup a callback function called on a raising edge on INT#
         The callback function will be called in another thread
         """
-
-        @WINFUNCTYPE(None, c_ulong)
-        def _callback(status):
-            fn(status)
-
-        self._callback = _callback  # Store to prevent being collected by GC
-        result = ch341dll.CH341SetIntRoutine(self.index, self._callback)
+        # Store to prevent being collected by GC
+        self._callback = _INT_CB_TYPE(fn)
+        result = _CH341SetIntRoutine(self.index, self._callback)
         if not result:
             raise CH341Error("Operation Failed.")
 
+    def interrupt_poll(self, timeout_ms: float = 1) -> Optional[int]:
+        """
+        Busy-poll INT# for a rising edge for up to 'timeout_ms' ms.
+        Returns the status word read at the edge, or None on timeout.
+
+        Unlike interrupt_bind(), no thread switch happens per interrupt,
+        which pays off at high interrupt rates, but the calling thread
+        stays busy while waiting. Edges shorter than one USB round-trip
+        may be missed.
+        """
+        deadline = time.perf_counter() + timeout_ms / 1000
+        status = c_ulong()
+        while True:
+            if not _CH341GetStatus(self.index, byref(status)):
+                raise CH341Error("Operation Failed.")
+            level = bool(status.value & _STATUS_INT)
+            # The first read only establishes the initial level
+            rising = level and self._int_level is False
+            self._int_level = level
+            if rising:
+                return status.value
+            if time.perf_counter() >= deadline:
+                return None
+
     def interrupt_clear(self):
         """
         Clear the callback set by interrupt_bind()
         """
         self._callback = c_void_p(0)
-        result = ch341dll.CH341SetIntRoutine(self.index, self._callback)
+        result = _CH341SetIntRoutine(self.index, self._callback)
         if not result:
             raise CH341Error("Operation Failed.")
 
@@ -440,7 +952,9 @@ eeprom_enum = [
     "EEPROM_24C2048",
     "EEPROM_24C4096",
 ]
-globals().update({i[1]: i[0] for i in enumerate(eeprom_enum)})
+for _value, _name in enumerate(eeprom_enum):
+    globals()[_name] = _value
+del _value, _name
 
 __all__ = [
     # Errors
@@ -458,6 +972,6 @@ __all__ = [
     "Ch341",
     "get_dll_version",
     "get_drv_version",
+    # EEPROM types
+    *eeprom_enum,
 ]
-
-__all__.extend(eeprom_enum)
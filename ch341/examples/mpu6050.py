@@ -1,28 +1,48 @@
 from ch341 import *
+import array
+import queue
 import struct
+import sys
+import threading
 
 MPU6050_ADDR = 0x68
 
+# Reused by every read below, so polling doesn't allocate per sample
+_rx_buf = bytearray(14)
+_unpack_7h = struct.Struct("!7h").unpack_from
+_unpack_3h = struct.Struct("!3h").unpack_from
+_unpack_1h = struct.Struct("!h").unpack_from
+
 
 def mpu6050_read_data(dev):
     # [ax,ay,az,t,gx,gy,gz]
-    tmp = dev.i2c_read(MPU6050_ADDR, 0x3B, length=14)
-    return struct.unpack("!hhhhhhh", tmp)
+    return _unpack_7h(dev.i2c_read(MPU6050_ADDR, 0x3B, _rx_buf, 14))
 
 
 def mpu6050_read_temp(dev):
-    tmp = dev.i2c_read(MPU6050_ADDR, 0x41, length=2)
-    return struct.unpack("!h", tmp)[0] / 340 + 36.53
+    tmp = _unpack_1h(dev.i2c_read(MPU6050_ADDR, 0x41, _rx_buf, 2))
+    return tmp[0] / 340 + 36.53
 
 
 def mpu6050_read_acce(dev):
-    tmp = dev.i2c_read(MPU6050_ADDR, 0x3B, length=6)
-    return struct.unpack("!hhh", tmp)
+    return _unpack_3h(dev.i2c_read(MPU6050_ADDR, 0x3B, _rx_buf, 6))
 
 
 def mpu6050_read_gyro(dev):
-    tmp = dev.i2c_read(MPU6050_ADDR, 0x43, length=6)
-    return struct.unpack("!hhh", tmp)
+    return _unpack_3h(dev.i2c_read(MPU6050_ADDR, 0x43, _rx_buf, 6))
+
+
+def mpu6050_read_gyro_batch(dev, raw):
+    # Fill 'raw' with len(raw) // 6 gyro samples, then decode them all with
+    # a single C-level conversion instead of unpacking sample by sample.
+    # Returns [gx0,gy0,gz0,gx1,gy1,gz1,...]
+    view = memoryview(raw)
+    for offset in range(0, len(raw), 6):
+        dev.i2c_read(MPU6050_ADDR, 0x43, view[offset : offset + 6])
+    samples = array.array("h", raw)
+    if sys.byteorder == "little":
+        samples.byteswap()  # the registers are big-endian
+    return samples
 
 
 def mpu6050_write_reg(dev, addr, dat):
@@ -37,8 +57,37 @@ def mpu6050_init(dev):
     mpu6050_write_reg(dev, 0x1B, 0x18)  # GYRO_CONFIG
 
 
+def mpu6050_reader(dev, samples, stop):
+    # The DLL releases the GIL while it waits on USB, so the next reads are
+    # already in flight while the main thread prints the previous batch.
+    raw = bytearray(6 * 16)
+    try:
+        while not stop.is_set():
+            samples.put(mpu6050_read_gyro_batch(dev, raw))
+    except Exception as e:
+        samples.put(e)  # re-raised by the main thread
+
+
 with Ch341(0) as dev:
     dev.set_i2c_speed(3)
     mpu6050_init(dev)
-    while 1:
-        print("gyro(%d\t%d\t%d\t)" % mpu6050_read_gyro(dev))
+    # Bounded, so the reader waits instead of piling up samples
+    # when printing can't keep up
+    samples = queue.Queue(maxsize=64)
+    stop = threading.Event()
+    reader = threading.Thread(target=mpu6050_reader, args=(dev, samples, stop))
+    reader.start()
+    try:
+        while 1:
+            batch = samples.get()
+            if isinstance(batch, Exception):
+                raise batch
+            for i in range(0, len(batch), 3):
+                print("gyro(%d\t%d\t%d\t)" % tuple(batch[i : i + 3]))
+    finally:
+        stop.set()
+        try:
+            samples.get_nowait()  # unblock the reader if the queue is full
+        except queue.Empty:
+            pass
+        reader.join()
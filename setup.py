@@ -1,4 +1,4 @@
-from setuptools import setup
+from setuptools import setup, find_namespace_packages
 
 setup(
     name="pych341",
@@ -10,7 +10,7 @@ setup(
     long_description="python bindings of ch341",
     license="MIT Licence",
     author="超级猫猫",
-    packages=["ch341", "ch341.examples"],
+    packages=find_namespace_packages(include=["ch341", "ch341.*"]),
     include_package_data=True,
     platforms=["windows"],
     install_requires=[],